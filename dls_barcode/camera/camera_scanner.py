@@ -1,16 +1,24 @@
 from __future__ import division
 
 import multiprocessing
-import time
+import threading
 import winsound
 
 import cv2
+import numpy as np
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
 
 from scan import GeometryScanner, SlotScanner, OpenScanner
+from dls_util.clock import monotonic_time
 from dls_util.image import Image, Color
+from .camera_stream import CameraStream
+from .frame_buffer import FrameBuffer
 from .overlay import PlateOverlay, TextOverlay, Overlay
-
-_OPENCV_MAJOR = cv2.__version__[0]
+from .overlay_mailbox import OverlayMailbox
 
 Q_LIMIT = 1
 SCANNED_TAG = "Scan Complete"
@@ -18,9 +26,23 @@ NO_PUCK_TIME = 2
 
 EXIT_KEY = 'q'
 
-# Maximum frame rate to sample at (rate will be further limited by speed at which frames can be processed)
-MAX_SAMPLE_RATE = 10.0
-INTERVAL = 1.0 / MAX_SAMPLE_RATE
+# Shown whenever the plate in view has been completely scanned; the same overlay is published each time
+_SCANNED_OVERLAY = TextOverlay(SCANNED_TAG, Color.Green())
+
+# Scale at which frames are searched for barcodes, if the 'locate at half resolution' option is set
+HALF_RES_LOCATE_SCALE = 0.5
+
+BEEP_DURATION = 200
+
+# Beep frequency for each possible number of unread slots, keyed by the number of slots on the plate
+_BEEP_FREQUENCIES = {}
+
+# Number of shared frame slots: three are held by the camera stream, up to Q_LIMIT are waiting to be
+# scanned, and one is being scanned. When all are in use, new frames are not sent to the scanner
+NUM_FRAME_SLOTS = 3 + Q_LIMIT + 1
+
+# Size of the preview image displayed to the user, relative to the captured frame
+PREVIEW_SCALE = 0.5
 
 
 class CameraScanner:
@@ -32,91 +54,118 @@ class CameraScanner:
     and the other to handle processing (scanning) of those images.
     """
     def __init__(self, result_queue):
-        """ The task queue is used to store a queue of captured frames to be processed; the overlay
-        queue stores Overlay objects which are drawn on to the image displayed to the user to highlight
-        certain features; and the result queue is used to pass on the results of successful scans to
-        the object that created the ContinuousScan.
+        """ The task pipe is used to pass captured frames to be processed from the capture process to
+        the scanner process (the frames themselves are held in a shared memory FrameBuffer, the pipe only
+        carries the slot index); the overlay mailbox holds the latest Overlay object which is drawn on to
+        the image displayed to the user to highlight certain features; and the result queue is used to
+        pass on the results of successful scans to the object that created the ContinuousScan.
         """
-        self.task_queue = multiprocessing.Queue()
-        self.overlay_queue = multiprocessing.Queue()
+        self.frame_buffer = None
+        self.task_rx, self.task_tx = multiprocessing.Pipe(duplex=False)
+        self.overlay_mailbox = OverlayMailbox()
         self.kill_queue = multiprocessing.Queue()
         self.result_queue = result_queue
 
     def stream_camera(self, config):
         """ Spawn the processes that will continuously capture and process images from the camera.
         """
-        capture_args = (self.task_queue, self.overlay_queue, self.kill_queue, config)
-        scanner_args = (self.task_queue, self.overlay_queue, self.result_queue, config)
+        width, height = config.camera_width.value(), config.camera_height.value()
+        self.frame_buffer = FrameBuffer(width, height, NUM_FRAME_SLOTS)
+
+        capture_args = (self.frame_buffer, self.task_tx, self.overlay_mailbox, self.kill_queue, config)
+        scanner_args = (self.frame_buffer, self.task_rx, self.overlay_mailbox, self.result_queue, config)
 
-        capture_pool = multiprocessing.Process(target=_capture_worker, args=capture_args)
-        scanner_pool = multiprocessing.Process(target=_scanner_worker, args=scanner_args)
+        capture_process = multiprocessing.Process(target=_capture_worker, args=capture_args)
+        scanner_process = multiprocessing.Process(target=_scanner_worker, args=scanner_args)
 
-        capture_pool.start()
-        scanner_pool.start()
+        capture_process.start()
+        scanner_process.start()
+
+        # Only the capture process writes to the task pipe. Close our end so that if the capture process
+        # dies, the scanner process gets an EOFError rather than waiting for a frame forever
+        self.task_tx.close()
 
     def kill(self):
+        # The capture process tells the scanner process to stop when it exits
         self.kill_queue.put(None)
-        self.task_queue.put(None)
 
 
-def _capture_worker(task_queue, overlay_queue, kill_queue, config):
+def _capture_worker(frame_buffer, task_tx, overlay_mailbox, kill_queue, config):
     """ Function used as the main loop of a worker process. Continuously captures images from
-    the camera and puts them on a queue to be processed. The images are displayed (as video)
-    to the user with appropriate highlights (taken from the overlay queue) which indicate the
-    position of scanned and unscanned barcodes.
+    the camera and puts them in the shared frame buffer to be processed. The images are displayed (as video)
+    to the user with appropriate highlights (taken from the overlay mailbox) which indicate the
+    position of scanned and unscanned barcodes. The highlights are drawn on a separate, smaller,
+    preview image so that the captured frames are never modified and can be given to the scanner
+    without being copied.
     """
-    # Initialize the camera
-    cap = cv2.VideoCapture(config.camera_number.value())
-    read_ok, _ = cap.read()
-    if not read_ok:
-        cap = cv2.VideoCapture(0)
-
-    if _OPENCV_MAJOR == '2':
-        width_flag = cv2.cv.CV_CAP_PROP_FRAME_COUNT
-        height_flag = cv2.cv.CV_CAP_PROP_FRAME_COUNT
-    else:
-        width_flag = cv2.CAP_PROP_FRAME_WIDTH
-        height_flag = cv2.CAP_PROP_FRAME_HEIGHT
-
-    cap.set(width_flag, config.camera_width.value())
-    cap.set(height_flag, config.camera_height.value())
-
-    # Store the latest image overlay which highlights the puck
-    latest_overlay = Overlay(0)
-    last_time = time.time()
-
-    while kill_queue.empty():
-        # Capture the next frame from the camera
-        read_ok, frame = cap.read()
-
-        # Add the frame to the task queue to be processed
-        if task_queue.qsize() < Q_LIMIT and (time.time() - last_time >= INTERVAL):
-            # Make a copy of image so the overlay doesn't overwrite it
-            task_queue.put(frame.copy())
-            last_time = time.time()
-
-        # Get the latest overlay
-        while not overlay_queue.empty():
-            latest_overlay = overlay_queue.get(False)
-
-        # Draw the overlay on the frame
-        latest_overlay.draw_on_image(frame)
-
-        # Display the frame on the screen
-        small = cv2.resize(frame, (0, 0), fx=0.5, fy=0.5)
-        cv2.imshow('Barcode Scanner', small)
-
-        # Exit scanning mode if the exit key is pressed
-        if cv2.waitKey(1) & 0xFF == ord(EXIT_KEY):
-            break
-
-    # Clean up camera and kill the worker threads
-    task_queue.put(None)
-    cap.release()
-    cv2.destroyAllWindows()
-
-
-def _scanner_worker(task_queue, overlay_queue, result_queue, options):
+    stream = None
+    try:
+        # Start reading from the camera; frames are captured in the background while we display them
+        stream = CameraStream(config.camera_number.value(), config.camera_width.value(),
+                              config.camera_height.value(), frame_buffer)
+        stream.start()
+        preview = None
+
+        # Store the latest image overlay which highlights the puck
+        latest_overlay = Overlay(0)
+
+        while kill_queue.empty():
+            # Get the next frame from the camera (this frame is ours until the next call). If there isn't
+            # one, keep the window responsive and check the exit key anyway
+            frame = stream.next_frame()
+            if frame is None:
+                if _exit_key_pressed():
+                    break
+                continue
+
+            # Get the latest overlay (if there is a new one). Its lifetime runs from when it is received,
+            # so that the scanner can publish the same overlay repeatedly
+            overlay = overlay_mailbox.read()
+            if overlay is not None:
+                overlay.restart()
+                latest_overlay = overlay
+
+            # Shrink the frame into the preview image and draw the overlay on that. The preview is only for
+            # display, so nearest neighbour sampling is good enough and much cheaper than interpolating
+            if preview is None:
+                height, width = frame.shape[:2]
+                preview = np.empty((int(height * PREVIEW_SCALE), int(width * PREVIEW_SCALE), 3), np.uint8)
+
+            cv2.resize(frame, (preview.shape[1], preview.shape[0]), dst=preview,
+                       interpolation=cv2.INTER_NEAREST)
+            latest_overlay.draw_on_image(preview, PREVIEW_SCALE)
+
+            # Display the preview on the screen
+            cv2.imshow('Barcode Scanner', preview)
+
+            # Hand the frame over to be processed (the scanner takes ownership of its slot). The scanner
+            # works on grayscale images, so do the conversion here, straight into the slot's gray plane.
+            # If the scanner is still busy with earlier frames there is no free slot and this frame is not
+            # sent, so the sample rate is limited by the speed at which frames can be processed
+            slot = stream.detach_frame()
+            if slot is not None:
+                cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=frame_buffer.gray(slot, frame.shape[:2]))
+                task_tx.send((slot, frame.shape))
+
+            # Exit scanning mode if the exit key is pressed
+            if _exit_key_pressed():
+                break
+
+    finally:
+        # Clean up camera and tell the scanner process to stop (even if capturing failed)
+        if stream is not None:
+            stream.stop()
+        cv2.destroyAllWindows()
+        task_tx.send(None)
+
+
+def _exit_key_pressed():
+    """ Process the events of the OpenCV windows (which keeps them responsive) and return True
+    if the exit key has been pressed. """
+    return cv2.waitKey(1) & 0xFF == ord(EXIT_KEY)
+
+
+def _scanner_worker(frame_buffer, task_rx, overlay_mailbox, result_queue, options):
     """ Function used as the main loop of a worker process. Scan images for barcodes,
     combining partial scans until a full puck is reached.
 
@@ -125,7 +174,7 @@ def _scanner_worker(task_queue, overlay_queue, result_queue, options):
     this previous plates so that we don't have to re-read any of the previously captured barcodes
     (because this is a relatively expensive operation).
     """
-    last_plate_time = time.time()
+    last_plate_time = monotonic_time()
 
     SlotScanner.DEBUG = options.slot_images.value()
     SlotScanner.DEBUG_DIR = options.slot_image_directory.value()
@@ -133,56 +182,92 @@ def _scanner_worker(task_queue, overlay_queue, result_queue, options):
     plate_type = options.plate_type.value()
     barcode_size = options.barcode_size.value()
 
+    # The options are a copy made when the process was started, so they can't change while it runs
+    console_frame = options.console_frame.value()
+    scan_beep = options.scan_beep.value()
+
     if plate_type == "None":
         scanner = OpenScanner(barcode_size)
     else:
-        scanner = GeometryScanner(plate_type, barcode_size)
+        locate_scale = HALF_RES_LOCATE_SCALE if options.scan_half_res.value() else 1
+        scanner = GeometryScanner(plate_type, barcode_size, locate_scale)
+
+    # Beeps are played on a separate thread, so that the (blocking) beep doesn't hold up scanning
+    beep_queue = queue.Queue(maxsize=1)
+    beep_thread = threading.Thread(target=_beep_worker, args=(beep_queue,))
+    beep_thread.daemon = True
+    beep_thread.start()
 
     while True:
-        # Get next image from queue (terminate if a queue contains a 'None' sentinel)
-        frame = task_queue.get(True)
-        if frame is None:
+        # Get next image from the pipe (terminate if it contains a 'None' sentinel, or if the capture
+        # process has gone away without sending one)
+        try:
+            task = task_rx.recv()
+        except EOFError:
+            break
+
+        if task is None:
             break
 
-        # Make grayscale version of image
-        image = Image(frame)
-        gray_image = image.to_grayscale()
+        # The grayscale image is a view onto the shared buffer (not a copy); it was converted by the
+        # capture process
+        slot, shape = task
+        gray_image = Image(frame_buffer.gray(slot, shape[:2]))
 
         # If we have an existing partial plate, merge the new plate with it and only try to read the
         # barcodes which haven't already been read. This significantly increases efficiency because
         # barcode read is expensive.
         scan_result = scanner.scan_next_frame(gray_image)
 
-        if options.console_frame.value():
+        if console_frame:
             scan_result.print_summary()
 
         if scan_result.success():
             # Record the time so we can see how long its been since we last saw a plate
-            last_plate_time = time.time()
+            last_plate_time = monotonic_time()
 
             plate = scan_result.plate()
 
             if scan_result.already_scanned():
-                overlay_queue.put(TextOverlay(SCANNED_TAG, Color.Green()))
+                overlay_mailbox.publish(_SCANNED_OVERLAY)
 
             elif scan_result.any_valid_barcodes():
-                overlay_queue.put(PlateOverlay(plate, options))
-                _plate_beep(plate, options)
+                overlay_mailbox.publish(PlateOverlay(plate, options))
+                if scan_beep:
+                    _plate_beep(plate, beep_queue)
 
             if scan_result.any_new_barcodes():
-                result_queue.put((plate, image))
+                # The slot will be reused for a later frame, so the result needs its own copy
+                frame = frame_buffer.frame(slot, shape)
+                result_queue.put((plate, Image(frame.copy())))
 
         else:
-            time_since_plate = time.time() - last_plate_time
+            time_since_plate = monotonic_time() - last_plate_time
             if time_since_plate > NO_PUCK_TIME:
-                overlay_queue.put(TextOverlay(scan_result.error(), Color.Red()))
+                overlay_mailbox.publish(TextOverlay(scan_result.error(), Color.Red()))
+
+        # Hand the slot back to the capture process
+        frame_buffer.release(slot)
 
 
-def _plate_beep(plate, options):
-    if not options.scan_beep.value():
-        return
+def _plate_beep(plate, beep_queue):
+    """ Request a beep with a pitch that indicates how many of the slots on the plate have been read. If
+    the previous beep is still waiting to be played, this one is skipped. """
+    num_slots = plate.num_slots
+    frequencies = _BEEP_FREQUENCIES.get(num_slots)
+    if frequencies is None:
+        frequencies = tuple(int(10000 * (k / num_slots) + 37) for k in range(num_slots + 1))
+        _BEEP_FREQUENCIES[num_slots] = frequencies
 
-    empty_fraction = (plate.num_slots - plate.num_valid_barcodes()) / plate.num_slots
-    frequency = int(10000 * empty_fraction + 37)
-    duration = 200
-    winsound.Beep(frequency, duration)
+    frequency = frequencies[num_slots - plate.num_valid_barcodes()]
+    try:
+        beep_queue.put_nowait(frequency)
+    except queue.Full:
+        pass
+
+
+def _beep_worker(beep_queue):
+    """ Function used as the main loop of the beep thread. Plays each requested beep in turn. """
+    while True:
+        frequency = beep_queue.get()
+        winsound.Beep(frequency, BEEP_DURATION)
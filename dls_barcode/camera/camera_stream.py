@@ -0,0 +1,111 @@
+import threading
+
+import cv2
+
+_OPENCV_MAJOR = cv2.__version__[0]
+
+# How long to wait for a new frame before checking whether the stream has been stopped
+FRAME_TIMEOUT = 0.5
+
+# How long to wait before trying again when a frame can't be read (e.g., the camera is disconnected)
+READ_RETRY_DELAY = 0.1
+
+
+class CameraStream:
+    """ Continuously reads frames from an attached camera on a background thread, so that capturing the
+    next frame from the camera overlaps with processing and displaying the current one.
+
+    Frames are read straight into slots of a shared FrameBuffer. The stream holds three slots (triple
+    buffering). At any time one slot is being written by the reader thread, one holds the latest complete
+    frame and one belongs to the consumer. When a frame has been read the thread swaps it with the latest
+    frame and sets an Event; the consumer waits on the Event and swaps its own slot with the latest frame.
+    Because the three slots are always distinct, the consumer may use the frame it holds until it asks
+    for the next one. The consumer can also detach its frame to give it to another process, in which case
+    the stream replaces it with a free slot from the buffer.
+    """
+    def __init__(self, camera_number, width, height, frame_buffer):
+        # Initialize the camera
+        self._cap = cv2.VideoCapture(camera_number)
+        read_ok, _ = self._cap.read()
+        if not read_ok:
+            self._cap = cv2.VideoCapture(0)
+
+        if _OPENCV_MAJOR == '2':
+            width_flag = cv2.cv.CV_CAP_PROP_FRAME_COUNT
+            height_flag = cv2.cv.CV_CAP_PROP_FRAME_COUNT
+        else:
+            width_flag = cv2.CAP_PROP_FRAME_WIDTH
+            height_flag = cv2.CAP_PROP_FRAME_HEIGHT
+
+        self._cap.set(width_flag, width)
+        self._cap.set(height_flag, height)
+
+        # Ask the driver to keep only the latest frame, so a read never returns one that has been waiting
+        # in its queue. Not all versions of OpenCV (or all camera backends) support this
+        buffer_size_flag = getattr(cv2, 'CAP_PROP_BUFFERSIZE', None)
+        if buffer_size_flag is not None:
+            self._cap.set(buffer_size_flag, 1)
+
+        self._frame_buffer = frame_buffer
+        self._back = frame_buffer.acquire()
+        self._middle = frame_buffer.acquire()
+        self._front = frame_buffer.acquire()
+
+        # Determine the shape of the frames that will be stored in the buffer
+        _, frame = self._cap.read()
+        self._shape = frame_buffer.write(self._back, frame)
+
+        self._lock = threading.Lock()
+        self._frame_ready = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._read_loop)
+        self._thread.daemon = True
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        """ Stop the reader thread and release the camera. """
+        self._stopped.set()
+        self._thread.join()
+        self._cap.release()
+
+    def next_frame(self):
+        """ Return the most recent frame that the consumer has not yet seen, or None if no new
+        frame arrives within the timeout. The returned array remains valid (and is not written to by
+        the reader thread) until the next call. """
+        if not self._frame_ready.wait(FRAME_TIMEOUT):
+            return None
+
+        with self._lock:
+            self._front, self._middle = self._middle, self._front
+            self._frame_ready.clear()
+
+        return self._frame_buffer.frame(self._front, self._shape)
+
+    def detach_frame(self):
+        """ Give up the slot holding the frame last returned by next_frame() and return its index. The
+        new owner of the slot is responsible for releasing it. Returns None if there is no free slot to
+        replace it with, in which case the frame stays with the stream. """
+        slot = self._frame_buffer.acquire()
+        if slot is None:
+            return None
+
+        detached, self._front = self._front, slot
+        return detached
+
+    def _read_loop(self):
+        while not self._stopped.is_set():
+            # Read into the back slot; OpenCV allocates a new array if the frame doesn't fit the slot
+            target = self._frame_buffer.frame(self._back, self._shape)
+            read_ok, frame = self._cap.read(target)
+            if not read_ok:
+                self._stopped.wait(READ_RETRY_DELAY)
+                continue
+
+            if frame is not target:
+                self._frame_buffer.write(self._back, frame)
+
+            with self._lock:
+                self._back, self._middle = self._middle, self._back
+                self._frame_ready.set()
@@ -0,0 +1,85 @@
+from __future__ import division
+
+import math
+import multiprocessing
+
+import cv2
+import numpy as np
+
+
+class FrameBuffer:
+    """ A pool of frame-sized slots held in shared memory. Used to pass captured frames from the
+    capture process to the scanner process without pickling or copying the image data; only the
+    index of the slot (and the shape of the frame stored in it) needs to be sent between the processes.
+
+    Each slot holds a color (BGR) frame followed by a grayscale plane, so that the grayscale conversion
+    can be done by the producer and the consumer can use the color frame only when it needs it.
+
+    There is a single producer, which acquires slots, and a single consumer, which releases them once it
+    has finished with the frame. The producer keeps its own list of free slots; the consumer sends the
+    indices of released slots back to it over a one-way pipe.
+
+    The buffer must be created before the worker processes are started and passed to them as an argument.
+    """
+    def __init__(self, width, height, num_slots):
+        self._width = width
+        self._height = height
+        self._color_size = width * height * 3
+        self._slot_size = self._color_size + width * height
+
+        self._memory = multiprocessing.RawArray('B', self._slot_size * num_slots)
+        self._free_slots = list(range(num_slots))
+        self._released_rx, self._released_tx = multiprocessing.Pipe(duplex=False)
+
+    def acquire(self):
+        """ Reserve a slot for writing. Returns the slot index, or None if every slot is in use. Only
+        call this from the producer process. """
+        while self._released_rx.poll():
+            self._free_slots.append(self._released_rx.recv())
+
+        if not self._free_slots:
+            return None
+        return self._free_slots.pop()
+
+    def release(self, slot):
+        """ Return a slot to the producer once the frame stored in it is no longer needed. Only call
+        this from the consumer process. """
+        self._released_tx.send(slot)
+
+    def fits(self, shape):
+        """ True if a frame of the specified shape can be stored in a slot without resizing it. """
+        return int(np.prod(shape)) <= self._color_size
+
+    def write(self, slot, frame):
+        """ Copy a frame into the specified slot and return the shape of the stored frame. A frame that
+        is larger than the slot is scaled down to fit it, keeping its aspect ratio. """
+        if self.fits(frame.shape):
+            shape = frame.shape
+            np.copyto(self.frame(slot, shape), frame)
+        else:
+            shape = self._fitted_shape(frame.shape)
+            cv2.resize(frame, (shape[1], shape[0]), dst=self.frame(slot, shape))
+
+        return shape
+
+    def frame(self, slot, shape):
+        """ Return a numpy array of the specified shape that is a view onto (not a copy of) the
+        color frame in the slot. """
+        return self._view(slot * self._slot_size, shape)
+
+    def gray(self, slot, shape):
+        """ Return a numpy array of the specified (height, width) that is a view onto (not a copy of)
+        the grayscale plane in the slot. """
+        return self._view(slot * self._slot_size + self._color_size, shape)
+
+    def _fitted_shape(self, shape):
+        """ The largest shape with the same aspect ratio (and number of channels) as the specified
+        shape, which fits in a slot. """
+        scale = math.sqrt(self._color_size / np.prod(shape))
+        height, width = int(shape[0] * scale), int(shape[1] * scale)
+        return (height, width) + tuple(shape[2:])
+
+    def _view(self, offset, shape):
+        size = int(np.prod(shape))
+        view = np.frombuffer(self._memory, dtype=np.uint8, count=size, offset=offset)
+        return view.reshape(shape)
@@ -1,5 +1,4 @@
-import time
-
+from dls_util.clock import monotonic_time
 from dls_util.image import Image, Color
 
 
@@ -9,13 +8,19 @@ class Overlay:
     """
     def __init__(self, lifetime):
         self._lifetime = lifetime
-        self._start_time = time.time()
+        self._start_time = monotonic_time()
+
+    def restart(self):
+        """ Start the lifetime of the overlay again from now. """
+        self._start_time = monotonic_time()
 
-    def draw_on_image(self, img):
+    def draw_on_image(self, img, scale=1):
+        """ Draw the overlay on the image. The scale is the size of the image relative to the frame
+        that the overlay was created for. """
         pass
 
     def has_expired(self):
-        return (time.time() - self._start_time) > self._lifetime
+        return (monotonic_time() - self._start_time) > self._lifetime
 
 
 class TextOverlay(Overlay):
@@ -26,17 +31,16 @@ class TextOverlay(Overlay):
 
         self._text = text
         self._color = color
-        self._lifetime = lifetime
-        self._start_time = time.time()
 
-    def draw_on_image(self, img):
+    def draw_on_image(self, img, scale=1):
         """ Draw the status message to the image.
         """
         image = Image(img)
+        image.draw_scale = scale
 
         # If the overlay has not expired, draw on the plate highlight and/or the status message
         if not self.has_expired():
-            image.draw_text(self._text, image.center(), self._color,
+            image.draw_text(self._text, image.center() / scale, self._color,
                             centered=True, scale=2, thickness=3)
 
 
@@ -44,20 +48,25 @@ class PlateOverlay(Overlay):
     """ Represents an overlay that can be drawn on top of an image. Used to draw the outline of a plate
     on the continuous scanner camera image to highlight to the user which barcodes on the plate have
     already been scanned.
+
+    Only the plate geometry and the highlight colors are kept (not the plate itself or the options), so
+    that the overlay is small enough to pass cheaply between processes.
     """
     def __init__(self, plate, options, lifetime=2):
         Overlay.__init__(self, lifetime)
 
-        self._plate = plate
-        self._options = options
+        self._geometry = plate.geometry()
+        self._pin_colors = plate.pin_colors(options)
 
-    def draw_on_image(self, img):
+    def draw_on_image(self, img, scale=1):
         """ Draw the plate highlight  to the image.
         """
         image = Image(img)
+        image.draw_scale = scale
 
         # If the overlay has not expired, draw on the plate highlight and/or the status message
         if not self.has_expired():
-            self._plate.draw_plate(image, Color.Blue())
-            self._plate.draw_pins(image, self._options)
+            self._geometry.draw_plate(image, Color.Blue())
+            for i, color in enumerate(self._pin_colors):
+                self._geometry.draw_pin_highlight(image, color, i + 1)
 
@@ -0,0 +1,60 @@
+import multiprocessing
+import pickle
+
+
+class OverlayMailbox:
+    """ Holds the most recent Overlay published by the scanner process so that the capture process
+    can draw it. Only the latest overlay is of interest, so rather than queueing every overlay the
+    scanner overwrites a single block of shared memory and the capture process reads it only when
+    it has changed.
+
+    There is one writer and one reader, so no lock is needed. A sequence number is used instead (a
+    'seqlock'): it is odd while the writer is changing the data and is incremented again once the
+    data is complete. The reader ignores the data if the sequence number was odd or changed while it
+    was being read, and simply tries again next time.
+
+    Publishing the same overlay object again reuses its pickled data, so overlays must not be changed
+    once they have been published.
+
+    The mailbox must be created before the worker processes are started and passed to them as an argument.
+    """
+    CAPACITY = 256 * 1024
+
+    def __init__(self, capacity=CAPACITY):
+        self._capacity = capacity
+        self._data = multiprocessing.RawArray('c', capacity)
+        self._length = multiprocessing.RawValue('L', 0)
+        self._sequence = multiprocessing.RawValue('L', 0)
+        self._last_read = 0
+        self._last_published = None
+        self._last_data = None
+
+    def publish(self, overlay):
+        """ Replace the overlay in the mailbox. Only call this from the (single) writer process. """
+        if overlay is self._last_published:
+            data = self._last_data
+        else:
+            data = pickle.dumps(overlay, pickle.HIGHEST_PROTOCOL)
+            self._last_published, self._last_data = overlay, data
+
+        if len(data) > self._capacity:
+            raise ValueError("Overlay is too large for the mailbox ({} bytes)".format(len(data)))
+
+        self._sequence.value += 1
+        self._data[:len(data)] = data
+        self._length.value = len(data)
+        self._sequence.value += 1
+
+    def read(self):
+        """ Return the overlay in the mailbox if it has changed since the last read, otherwise return
+        None. Only call this from the (single) reader process. """
+        sequence = self._sequence.value
+        if sequence == self._last_read or sequence % 2 == 1:
+            return None
+
+        data = self._data[:self._length.value]
+        if self._sequence.value != sequence:
+            return None
+
+        self._last_read = sequence
+        return pickle.loads(data)
@@ -38,6 +38,7 @@ class BarcodeConfig(Config):
 
         self.scan_beep = add(BoolConfigItem, "Beep While Scanning", default=True)
         self.scan_clipboard = add(BoolConfigItem, "Results to Clipboard", default=True)
+        self.scan_half_res = add(BoolConfigItem, "Locate at Half Resolution", default=False)
 
         self.image_puck = add(BoolConfigItem, "Draw Puck", default=True)
         self.image_pins = add(BoolConfigItem, "Draw Slot Highlights", default=True)
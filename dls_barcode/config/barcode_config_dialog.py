@@ -38,6 +38,7 @@ class BarcodeConfigDialog(ConfigDialog):
         self.start_group("Scanning")
         add(cfg.scan_beep)
         add(cfg.scan_clipboard)
+        add(cfg.scan_half_res)
 
         self.start_group("Result Image")
         add(cfg.image_puck)
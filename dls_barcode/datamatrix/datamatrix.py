@@ -1,3 +1,5 @@
+import cv2
+
 from .locate import Locator
 from .read import DatamatrixSizeTable
 from .read import DatamatrixReaderError, ReedSolomonError
@@ -62,6 +64,29 @@ class DataMatrix:
             self._read(self._image, offsets)
             self._is_read_performed = True
 
+    @staticmethod
+    def read_all(barcodes, offsets=wiggle_offsets):
+        """ Perform the read operation for each of the barcodes that hasn't already been read. This gives
+        the same results as calling perform_read() on each barcode in turn. Barcodes that are in the same
+        image and have the same matrix size are sampled together at the first offset; the samples at any
+        other offsets are taken for one barcode at a time, as needed.
+        """
+        # Group the barcodes that can be sampled together
+        groups = {}
+        for bc in barcodes:
+            if not bc.is_read():
+                key = (id(bc._image), bc._matrix_size)
+                groups.setdefault(key, []).append(bc)
+
+        for group in groups.values():
+            bit_reader = DatamatrixBitReader(group[0]._matrix_size)
+            finder_patterns = [bc._finder_pattern for bc in group]
+            all_samples = bit_reader.sample_bits(finder_patterns, offsets[0], group[0]._image)
+
+            for bc, samples in zip(group, all_samples):
+                bc._read(bc._image, offsets, samples)
+                bc._is_read_performed = True
+
     def is_read(self):
         """ True if the read operation has been performed (whether successful or not) """
         return self._is_read_performed
@@ -102,9 +127,10 @@ class DataMatrix:
         """ The radius (center-to-corner distance) of the DataMatrix finder pattern. """
         return self._finder_pattern.radius
 
-    def _read(self, gray_image, offsets):
+    def _read(self, gray_image, offsets, first_samples=None):
         """ From the supplied grayscale image, attempt to read the barcode at the location
-        given by the datamatrix finder pattern.
+        given by the datamatrix finder pattern. The samples of the image at the first offset may
+        be supplied if they have already been taken.
         """
         bit_reader = DatamatrixBitReader(self._matrix_size)
         extractor = DatamatrixByteExtractor()
@@ -114,11 +140,12 @@ class DataMatrix:
         message_length = DatamatrixSizeTable.num_data_bytes(self._matrix_size)
 
         # Try a few different small offsets for the sample positions until we find one that works
-        for offset in offsets:
+        for i, offset in enumerate(offsets):
             # Read the bit array at the target location (with offset)
             # If the bit array is valid, decode it and create a datamatrix object
+            samples = first_samples if i == 0 else None
             try:
-                bit_array = bit_reader.read_bit_array(self._finder_pattern, offset, gray_image)
+                bit_array = bit_reader.read_bit_array(self._finder_pattern, offset, gray_image, samples)
                 encoded_bytes = extractor.extract_bytes(bit_array)
                 decoded_bytes = decoder.decode(encoded_bytes, message_length)
                 data = interpreter.interpret_bytes(decoded_bytes)
@@ -140,11 +167,19 @@ class DataMatrix:
         img.draw_line(fp.c1, fp.c3, color)
 
     @staticmethod
-    def locate_all_barcodes_in_image(grayscale_img, matrix_size=DEFAULT_SIZE):
-        """ Searches the image for all datamatrix finder patterns
+    def locate_all_barcodes_in_image(grayscale_img, matrix_size=DEFAULT_SIZE, locate_scale=1):
+        """ Searches the image for all datamatrix finder patterns. If a locate scale is given, the search
+        is performed on a copy of the image resized by that factor, but the barcodes are still read from
+        the full size image.
         """
         locator = Locator()
-        finder_patterns = locator.locate_shallow(grayscale_img)
+        if locate_scale == 1:
+            finder_patterns = locator.locate_shallow(grayscale_img)
+        else:
+            small_img = grayscale_img.rescale(locate_scale, cv2.INTER_AREA)
+            finder_patterns = locator.locate_shallow(small_img)
+            finder_patterns = [fp.scale(1 / locate_scale) for fp in finder_patterns]
+
         unread_barcodes = DataMatrix._fps_to_barcodes(grayscale_img, finder_patterns, matrix_size)
         return unread_barcodes
 
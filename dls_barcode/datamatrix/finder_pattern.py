@@ -38,6 +38,11 @@ class FinderPattern:
         image.draw_line(self.c1, self.c2, color, 1)
         image.draw_line(self.c3, self.c1, color, 1)
 
+    def scale(self, factor):
+        """ Return a new finder pattern that is a scaled version of this one, e.g., to convert
+        a pattern located in a resized image back to the coordinates of the original image. """
+        return FinderPattern(self.corner * factor, self.baseVector * factor, self.sideVector * factor)
+
     def correct_lengths(self, expected_length):
         """ Return a new finder pattern that is in the same position as this one but with
         base/side being the same length. """
@@ -15,8 +15,9 @@ class DatamatrixBitReader:
     def __init__(self, matrix_size):
         self._matrix_size = matrix_size
 
-    def read_bit_array(self, finder_pattern, offset, cv_img):
-        """ Return a datamatrix boolean array by sampling points in the image array.
+    def read_bit_array(self, finder_pattern, offset, cv_img, samples=None):
+        """ Return a datamatrix boolean array by sampling points in the image array. If the samples for
+        this finder pattern and offset have already been taken (by sample_bits()), they can be supplied.
 
         After extracting the samples, this function performs a threshold on each ([0, 255] -> [0, 1])
         based on what it perceives as the optimal threshold value. To find this optimum, it gets the
@@ -28,17 +29,14 @@ class DatamatrixBitReader:
         If this function doesn't work, it's quite likely that the cause is that one of the vectors
         passed in has slightly the wrong length.
         """
-        n = self._matrix_size
-
         try:
-            # Determine the pixel locations to sample
-            datamatrix_samples = np.empty((n, n))
-            grid = self._datamatrix_sample_points(finder_pattern, offset, matrix_size=n)
-            for ((x, y), point) in grid:
-                datamatrix_samples[y, x] = int(self._window_average(cv_img, point))
-
-            thresholds = [self._threshold(datamatrix_samples, val) for val in range(256)]
-            b_errors = [self._border_errors(t) for t in thresholds]
+            # Determine the pixel locations to sample and sample them
+            if samples is None:
+                samples = self.sample_bits([finder_pattern], offset, cv_img)[0]
+
+            # Threshold the samples at every possible value at once (an array of 256 boolean matrices)
+            thresholds = self._threshold(samples, np.arange(256)[:, None, None])
+            b_errors = self._border_errors(thresholds).tolist()
             best_threshold_value, badness = self._smart_minimum(b_errors)
 
             _ = badness  # Throw this away (for now).
@@ -46,7 +44,7 @@ class DatamatrixBitReader:
 
             # Flip the datamatrix so its reference corner is at large i, small j.
             # Also now remove the border (reference edges and timing patterns).
-            bit_array = self._threshold(datamatrix_samples, best_threshold_value)[::-1, :][1:-1, 1:-1]
+            bit_array = self._threshold(samples, best_threshold_value)[::-1, :][1:-1, 1:-1]
 
         except IndexError:
             raise DatamatrixReaderError("Error reading Datamatrix")
@@ -55,26 +53,61 @@ class DatamatrixBitReader:
 
         return bit_array
 
+    def sample_bits(self, finder_patterns, offset, cv_img):
+        """ Return a list holding the (n, n) array of brightness samples at the bit positions of the
+        datamatrix for each of the finder patterns, which must all be in the same image.
+        """
+        xs, ys = self._datamatrix_sample_points(finder_patterns, offset, matrix_size=self._matrix_size)
+        return list(self._sample_points(cv_img, xs, ys))
+
     @staticmethod
-    def _datamatrix_sample_points(finder_pattern, offset, matrix_size):
-        """ Get pixel positions corresponding to individual bits in a datamatrix. This is done based on the
-        position of a datamatrix.
+    def _datamatrix_sample_points(finder_patterns, offset, matrix_size):
+        """ Get pixel positions corresponding to individual bits in each of a list of datamatrices. This is
+        done based on the positions of the datamatrix finder patterns.
 
-        Each returned pixel position comes also with an (x, y) pair which denotes the position of the
-        corresponding bit in the datamatrix, starting at (0, 0) in the bottom left corner and up to (n-1, n-1)
-        at the top right.
+        Returns two (k, n, n) integer arrays holding the x and y pixel coordinates for the k finder patterns.
+        Element [i, y, x] of each corresponds to bit (x, y) in datamatrix i, starting at (0, 0) in the bottom
+        left corner and up to (n-1, n-1) at the top right.
 
         The base and side vectors are free to be non-orthogonal, so any skew of the datamatrix (because of lens
         distortion, say) is already accounted for (to first order).
         """
         n = matrix_size
-        corner = finder_pattern.corner.tuple()
-        base_vec = np.asarray(finder_pattern.baseVector.tuple())
-        side_vec = np.asarray(finder_pattern.sideVector.tuple())
+        corners = np.asarray([fp.corner.tuple() for fp in finder_patterns])[:, None, None, :]
+        base_vecs = np.asarray([fp.baseVector.tuple() for fp in finder_patterns])[:, None, None, :]
+        side_vecs = np.asarray([fp.sideVector.tuple() for fp in finder_patterns])[:, None, None, :]
+
+        base_steps = (2 * np.arange(n) + 1 + offset[0])[None, None, :, None]
+        side_steps = (2 * np.arange(n) + 1 + offset[1])[None, :, None, None]
+
+        # Conversion to int truncates towards zero, the same as int()
+        points = (corners + (base_steps * base_vecs + side_steps * side_vecs) / (2 * n)).astype(int)
+        return points[..., 0], points[..., 1]
+
+    @classmethod
+    def _sample_points(cls, arr, xs, ys, side=3):
+        """ Return a (k, n, n) array of the average brightness over a small region surrounding each of the
+        specified points (given as (k, n, n) arrays), calculated for all of the points at once. For any
+        datamatrix that has a region which is not completely within the image, fall back to sampling one
+        point at a time.
+        """
+        height, width = arr.shape[:2]
+        x1, y1 = xs - (side // 2), ys - (side // 2)
+        in_image = ((x1.min(axis=(1, 2)) >= 0) & (y1.min(axis=(1, 2)) >= 0) &
+                    (x1.max(axis=(1, 2)) + side <= width) & (y1.max(axis=(1, 2)) + side <= height))
+
+        samples = np.empty(xs.shape)
+        if np.any(in_image):
+            dy, dx = np.mgrid[0:side, 0:side]
+            windows = arr[y1[in_image][..., None, None] + dy, x1[in_image][..., None, None] + dx]
+            totals = windows.sum(axis=(3, 4), dtype=np.int64)
+            samples[in_image] = totals // (side * side)
+
+        for i in np.flatnonzero(~in_image):
+            for y, x in itertools.product(range(xs.shape[1]), range(xs.shape[2])):
+                samples[i, y, x] = cls._window_average(arr, (xs[i, y, x], ys[i, y, x]), side)
 
-        return (((x, y),
-                 list(map(int, corner + ((2*x+1+offset[0])*base_vec + (2*y+1+offset[1])*side_vec)/(2*n))))
-                for x, y in itertools.product(range(n), range(n)))
+        return samples
 
     @staticmethod
     def _smart_minimum(data):
@@ -105,25 +138,25 @@ class DatamatrixBitReader:
 
     @staticmethod
     def _threshold(matrix, value):
-        """Return a thresholded matrix, with low values corresponding to True.
+        """Return a thresholded matrix, with low values corresponding to True. The value may also be an
+        array of values (broadcast against the matrix) to threshold at each of them at once.
         """
-        value_matrix = np.empty_like(matrix)
-        value_matrix.fill(value)
-        return matrix < value_matrix
+        return matrix < value
 
     @staticmethod
-    def _border_errors(datamatrix_candidate):
-        """Return the number of border bits not matching datamatrix specification.
+    def _border_errors(datamatrix_candidates):
+        """Return the number of border bits not matching datamatrix specification, for each of a
+        stack of candidate matrices (an array of shape (k, n, n)).
         """
-        n, m = datamatrix_candidate.shape
+        _, n, m = datamatrix_candidates.shape
         # Could extend to non-square datamatrices (which do exist)...
         assert n == m and n % 2 == 0
-        errors_in_base = datamatrix_candidate[:1, :] != np.ones((1, n))
-        errors_in_side = datamatrix_candidate[:, :1] != np.ones((n, 1))
-        errors_in_timing = (  # ("Timing pattern".)
-            [[datamatrix_candidate[i, -1:]] != [(i+1) % 2] for i in range(n)] +
-            [[datamatrix_candidate[-1:, i]] != [(i+1) % 2] for i in range(n)])
-        return sum(map(np.sum, (errors_in_base, errors_in_side, errors_in_timing)))
+        timing = (np.arange(n) + 1) % 2 == 1  # ("Timing pattern".)
+        errors_in_base = np.sum(~datamatrix_candidates[:, 0, :], axis=1)
+        errors_in_side = np.sum(~datamatrix_candidates[:, :, 0], axis=1)
+        errors_in_timing = (np.sum(datamatrix_candidates[:, :, -1] != timing, axis=1) +
+                            np.sum(datamatrix_candidates[:, -1, :] != timing, axis=1))
+        return errors_in_base + errors_in_side + errors_in_timing
 
     @staticmethod
     def _perform_sanity_check(bit_array):
@@ -1,11 +1,17 @@
 import uuid
 
+import numpy as np
+
 from dls_barcode.geometry import Geometry
 from .slot import Slot, EMPTY_SLOT_SYMBOL, NOT_FOUND_SLOT_SYMBOL
 
 
 class Plate:
     """ Represents a sample holder plate.
+
+    The state of every slot is also kept in a single numpy array owned by the plate (each Slot writes
+    its state into its own element), so that the status functions, which are called for every frame,
+    can count and filter the slots in one vectorized operation rather than querying each Slot in turn.
     """
     def __init__(self, geometry_name, num_slots=-1):
         self.id = str(uuid.uuid1())
@@ -19,7 +25,8 @@ class Plate:
         self._geometry = None
 
         # Initialize slots
-        self._slots = [Slot(i) for i in range(1, self.num_slots+1)]
+        self._states = np.full(self.num_slots, Slot.NO_RESULT, dtype=np.int8)
+        self._slots = [Slot(i, self._states) for i in range(1, self.num_slots+1)]
 
     #########################
     # ACCESSOR FUNCTIONS
@@ -46,16 +53,16 @@ class Plate:
             slot.set_bounds(bounds)
 
     def invalid_slots(self):
-        return [s for s in self._slots if s.state() != Slot.VALID]
+        return [self._slots[i] for i in np.flatnonzero(self._states != Slot.VALID)]
 
     #########################
     # STATUS FUNCTIONS
     #########################
     def num_empty_slots(self):
-        return len([slot for slot in self._slots if slot.state() == Slot.EMPTY])
+        return int(np.count_nonzero(self._states == Slot.EMPTY))
 
     def num_valid_barcodes(self):
-        return len([slot for slot in self._slots if slot.state() == Slot.VALID])
+        return int(np.count_nonzero(self._states == Slot.VALID))
 
     def num_unread_barcodes(self):
         return self.num_slots - self.num_valid_barcodes() - self.num_empty_slots()
@@ -68,8 +75,8 @@ class Plate:
         if barcode == EMPTY_SLOT_SYMBOL or barcode == NOT_FOUND_SLOT_SYMBOL:
             return False
 
-        for b in self.barcodes():
-            if b == barcode:
+        for i in np.flatnonzero(self._states == Slot.VALID):
+            if self._slots[i].barcode_data() == barcode:
                 return True
 
         return False
@@ -82,11 +89,9 @@ class Plate:
         if plate_a.type != plate_b.type:
             return False
 
-        for i, slot_a in enumerate(plate_a._slots):
-            slot_b = plate_b.slot(i+1)
-            if slot_a.state() == Slot.VALID:
-                if slot_a.barcode_data() == slot_b.barcode_data():
-                    return True
+        for i in np.flatnonzero(plate_a._states == Slot.VALID):
+            if plate_a._slots[i].barcode_data() == plate_b.slot(i+1).barcode_data():
+                return True
 
         return False
 
@@ -94,23 +99,22 @@ class Plate:
     # DRAWING FUNCTIONS
     #########################
     def draw_barcodes(self, img, color):
-        for slot in self._slots:
-            if slot.state() == slot.VALID:
-                slot.barcode().draw(img, color)
+        for i in np.flatnonzero(self._states == Slot.VALID):
+            self._slots[i].barcode().draw(img, color)
 
     def draw_plate(self, img, color):
         self._geometry.draw_plate(img, color)
 
     def draw_pins(self, img, options):
-        for i, slot in enumerate(self._slots):
-            state = slot.state()
-            if state == Slot.VALID:
-                color = options.col_ok()
-            elif state == Slot.EMPTY:
-                color = options.col_empty()
-            else:
-                color = options.col_bad()
+        for i, color in enumerate(self.pin_colors(options)):
             self._geometry.draw_pin_highlight(img, color, i + 1)
 
+    def pin_colors(self, options):
+        """ Returns a list of the colors used to highlight each slot, according to its state. """
+        palette = {Slot.VALID: options.col_ok(),
+                   Slot.EMPTY: options.col_empty(),
+                   Slot.NO_RESULT: options.col_bad()}
+        return [palette[state] for state in self._states.tolist()]
+
     def crop_image(self, img):
         self._geometry.crop_image(img)
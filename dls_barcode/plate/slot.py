@@ -3,18 +3,21 @@ NOT_FOUND_SLOT_SYMBOL = '-CANT-FIND-'
 
 
 class Slot:
-    """ Represents a single pin slot in a sample holder.
+    """ Represents a single pin slot in a sample holder. If the slot belongs to a Plate, the plate's
+    array of slot states is supplied and the slot keeps its own element of that array up to date.
     """
     NO_RESULT = 0
     EMPTY = 1
     VALID = 2
 
-    def __init__(self, number):
+    def __init__(self, number, plate_states=None):
         self._number = number
+        self._plate_states = plate_states
         self._bounds = None
         self._barcode_position = None
         self._barcode = None
         self._state = self.NO_RESULT
+        self._barcode_data = NOT_FOUND_SLOT_SYMBOL
 
         self._total_frames = 0
         self._barcode_set_this_frame = False
@@ -56,24 +59,28 @@ class Slot:
     def set_barcode(self, barcode):
         if barcode and barcode.is_valid():
             self._barcode = barcode
-            self._state = self.VALID
+            self._set_state(self.VALID)
+            self._barcode_data = barcode.data()
             self._barcode_set_this_frame = True
 
     def set_empty(self):
         self._barcode = None
-        self._state = self.EMPTY
+        self._set_state(self.EMPTY)
+        self._barcode_data = EMPTY_SLOT_SYMBOL
 
     def set_no_result(self):
         self._barcode = None
-        self._state = self.NO_RESULT
+        self._set_state(self.NO_RESULT)
+        self._barcode_data = NOT_FOUND_SLOT_SYMBOL
+
+    def _set_state(self, state):
+        self._state = state
+        if self._plate_states is not None:
+            self._plate_states[self._number - 1] = state
 
     def barcode_data(self):
         """ Gets a string representation of the barcode data; returns an empty
-        string if slot is empty
+        string if slot is empty. The value is updated whenever the state of the slot changes so this is
+        just a lookup.
         """
-        if self._state == self.EMPTY:
-            return EMPTY_SLOT_SYMBOL
-        elif self._state == self.VALID:
-            return self._barcode.data()
-        else:
-            return NOT_FOUND_SLOT_SYMBOL
+        return self._barcode_data
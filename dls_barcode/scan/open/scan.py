@@ -54,10 +54,9 @@ class OpenScanner:
 
     def _perform_frame_scan(self):
         barcodes = self._locate_all_barcodes_in_image()
+        DataMatrix.read_all(barcodes, DataMatrix.DIAG_WIGGLES)
 
         for barcode in barcodes:
-            barcode.perform_read(DataMatrix.DIAG_WIGGLES)
-
             if self._is_barcode_new(barcode):
                 # todo: limit number of previous barcodes stored
                 self._old_barcode_data.append(barcode.data())
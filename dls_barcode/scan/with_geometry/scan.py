@@ -15,9 +15,12 @@ class NoBarcodesError(Exception):
 
 
 class GeometryScanner:
-    def __init__(self, plate_type, barcode_size):
+    def __init__(self, plate_type, barcode_size, locate_scale=1):
+        """ The locate scale is the factor by which frames are resized before searching them for barcodes
+        (the barcodes are always read from the full size frame). It isn't used for single images. """
         self.plate_type = plate_type
         self.barcode_size = barcode_size
+        self.locate_scale = locate_scale
 
         self._frame_number = 0
         self._plate = None
@@ -85,7 +88,8 @@ class GeometryScanner:
             # barcodes = DataMatrix.locate_all_barcodes_in_image_deep(self._frame_img, self.barcode_size)
             barcodes = DataMatrix.locate_all_barcodes_in_image(self._frame_img, self.barcode_size)
         else:
-            barcodes = DataMatrix.locate_all_barcodes_in_image(self._frame_img, self.barcode_size)
+            barcodes = DataMatrix.locate_all_barcodes_in_image(self._frame_img, self.barcode_size,
+                                                               self.locate_scale)
 
         if len(barcodes) == 0:
             raise NoBarcodesError("No Barcodes Detected In Image")
@@ -107,8 +111,7 @@ class GeometryScanner:
         return geometry
 
     def _initialize_plate_from_barcodes(self):
-        for bc in self._barcodes:
-            bc.perform_read()
+        DataMatrix.read_all(self._barcodes)
 
         if self._any_valid_barcodes():
             slot_scanner = self._create_slot_scanner()
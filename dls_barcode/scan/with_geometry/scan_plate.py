@@ -1,5 +1,6 @@
 import random
 
+from dls_barcode.datamatrix import DataMatrix
 from plate.slot import Slot
 
 
@@ -30,16 +31,21 @@ class PlateScanner:
         self._frame_num += 1
         self._plate.set_geometry(geometry)
 
+        # Find the barcode from the new set that is in each slot position
+        slots = self._plate.slots()
+        slot_barcodes = [self._find_matching_barcode(slot.bounds(), barcodes) for slot in slots]
+
+        # Read the barcodes in all of the slots that we don't yet have valid data for together
+        unread_barcodes = [bc for slot, bc in zip(slots, slot_barcodes) if bc and slot.state() != Slot.VALID]
+        DataMatrix.read_all(unread_barcodes)
+
         # Fill each slot with the correct barcodes
-        for slot in self._plate.slots():
-            self._new_slot_frame(barcodes, slot, slot_scanner)
+        for slot, barcode in zip(slots, slot_barcodes):
+            self._new_slot_frame(barcode, slot, slot_scanner)
 
-    def _new_slot_frame(self, barcodes, slot, slot_scanner):
+    def _new_slot_frame(self, barcode, slot, slot_scanner):
         slot.new_frame()
-
-        # Find the barcode from the new set that is in the slot position
         bounds = slot.bounds()
-        barcode = self._find_matching_barcode(bounds, barcodes)
 
         # Update the barcode position - use the actual position of the barcode if available,
         # otherwise use the slot center position (from geometry) as an approximation
@@ -0,0 +1,4 @@
+import time
+
+# The monotonic clock can't jump if the system clock is changed (Python 2 only has time.time())
+monotonic_time = getattr(time, 'monotonic', time.time)
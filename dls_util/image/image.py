@@ -23,7 +23,8 @@ class Image:
         else:
             self.channels = 1
 
-        # All draw requests will be offset by this amount
+        # All draw requests will be scaled by this factor and then offset by this amount
+        self.draw_scale = 1
         self.draw_offset = Point(0, 0)
 
     def is_valid(self):
@@ -61,16 +62,16 @@ class Image:
     ############################
     # Transformation Functions
     ############################
-    def rescale(self, factor):
+    def rescale(self, factor, interpolation=cv2.INTER_LINEAR):
         """ Return a new Image that is a version of this image, resized to the specified scale
         """
         scaled_size = (int(self.width * factor), int(self.height * factor))
-        return self.resize(scaled_size)
+        return self.resize(scaled_size, interpolation)
 
-    def resize(self, new_size):
+    def resize(self, new_size, interpolation=cv2.INTER_LINEAR):
         """ Return a new Image that is a resized version of this one
         """
-        resized_img = cv2.resize(self.img, new_size)
+        resized_img = cv2.resize(self.img, new_size, interpolation=interpolation)
         return Image(resized_img)
 
     def rotate(self, radians, center):
@@ -232,37 +233,51 @@ class Image:
         """ Draw the specified rectangle on the image (in place). """
         top_left = self._format_point(Point(roi[0], roi[1]))
         bottom_right = self._format_point(Point(roi[2], roi[3]))
+        thickness = self._format_thickness(thickness)
         cv2.rectangle(self.img, top_left.tuple(), bottom_right.tuple(), color.bgra(), thickness=thickness)
 
     def draw_circle(self, circle, color, thickness=2):
         """ Draw the specified circle on the image (in place). """
         center = self._format_point(circle.center())
-        cv2.circle(self.img, center.tuple(), int(circle.radius()), color.bgra(), thickness=thickness)
+        radius = int(circle.radius() * self.draw_scale)
+        thickness = self._format_thickness(thickness)
+        cv2.circle(self.img, center.tuple(), radius, color.bgra(), thickness=thickness)
 
     def draw_dot(self, center, color, thickness=5):
         """ Draw the specified dot on the image (in place). """
         center = self._format_point(center)
+        thickness = self._format_thickness(thickness)
         cv2.circle(self.img, center.tuple(), radius=0, color=color.bgra(), thickness=thickness)
 
     def draw_line(self, p1, p2, color, thickness=2):
         """ Draw the specified line on the image (in place). """
         p1 = self._format_point(p1)
         p2 = self._format_point(p2)
+        thickness = self._format_thickness(thickness)
         cv2.line(self.img, p1.tuple(), p2.tuple(), color.bgra(), thickness=thickness)
 
     def draw_text(self, text, position, color, centered=False, scale=1.5, thickness=3):
         """ Draw the specified text on the image (in place). """
+        scale = scale * self.draw_scale
+        thickness = self._format_thickness(thickness)
+        position = self._format_point(position)
         if centered:
             text_size = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, fontScale=scale, thickness=thickness)[0]
             text_size = Point(-text_size[0]/2.0, text_size[1]/2.0)
-            position = (position + text_size)
-        position = self._format_point(position)
+            position = (position + text_size).intify()
         cv2.putText(self.img, text, position.tuple(), cv2.FONT_HERSHEY_SIMPLEX, fontScale=scale,
                     color=color.bgra(), thickness=thickness)
 
     def _format_point(self, point):
-        """ Offset the point and ensure the coordinates are integers. """
-        return (point + self.draw_offset).intify()
+        """ Scale and offset the point and ensure the coordinates are integers. """
+        return (point * self.draw_scale + self.draw_offset).intify()
+
+    def _format_thickness(self, thickness):
+        """ Scale a line thickness, keeping lines at least 1 pixel wide. Zero or negative thickness
+        values (which have special meanings to OpenCV) are left unchanged. """
+        if thickness <= 0:
+            return thickness
+        return max(1, int(round(thickness * self.draw_scale)))
 
     ############################
     # Analysis Functions
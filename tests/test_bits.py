@@ -0,0 +1,214 @@
+from __future__ import division
+
+import itertools
+import unittest
+
+import numpy as np
+
+from datamatrix import DataMatrix
+from datamatrix.finder_pattern import FinderPattern
+from datamatrix.read import DatamatrixBitReader, DatamatrixReaderError
+from datamatrix.read import DatamatrixByteExtractor, DatamatrixSizeTable, ReedSolomonDecoder
+from dls_util.image import Image
+from dls_util.shape import Point
+
+MATRIX_SIZE = 14
+MODULE_SIZE = 10
+
+
+def reference_samples(finder_pattern, offset, img, n=MATRIX_SIZE):
+    """ Sample the image one point at a time, the way the bit reader originally did. """
+    corner = finder_pattern.corner.tuple()
+    base_vec = np.asarray(finder_pattern.baseVector.tuple())
+    side_vec = np.asarray(finder_pattern.sideVector.tuple())
+
+    samples = np.empty((n, n))
+    for x, y in itertools.product(range(n), range(n)):
+        point = list(map(int, corner + ((2*x+1+offset[0])*base_vec + (2*y+1+offset[1])*side_vec)/(2*n)))
+        x1, y1 = point[0] - 1, point[1] - 1
+        samples[y, x] = int(np.sum(img[y1:y1+3, x1:x1+3]) / 9)
+    return samples
+
+
+def reference_bit_array(samples):
+    """ Threshold the samples one threshold value at a time, the way the bit reader originally did. """
+    n = samples.shape[0]
+    b_errors = []
+    for value in range(256):
+        candidate = samples < value
+        errors = np.sum(~candidate[0, :]) + np.sum(~candidate[:, 0])
+        errors += sum(candidate[i, -1] != ((i+1) % 2 == 1) for i in range(n))
+        errors += sum(candidate[-1, i] != ((i+1) % 2 == 1) for i in range(n))
+        b_errors.append(errors)
+
+    best_value, _ = DatamatrixBitReader._smart_minimum(b_errors)
+    return (samples < best_value)[::-1, :][1:-1, 1:-1]
+
+
+def draw_datamatrix(img, matrix, corner):
+    """ Draw a datamatrix (matrix[y, x] is True for a dark module, with (0, 0) at the bottom left) on a
+    white image, and return its finder pattern. """
+    n = matrix.shape[0]
+    for x, y in itertools.product(range(n), range(n)):
+        if matrix[y, x]:
+            left, bottom = corner[0] + MODULE_SIZE * x, corner[1] - MODULE_SIZE * y
+            img[bottom - MODULE_SIZE:bottom, left:left + MODULE_SIZE] = 0
+
+    length = MODULE_SIZE * n
+    return FinderPattern(Point(*corner), Point(length, 0), Point(0, -length))
+
+
+def white_image():
+    return np.full((300, 400), 255, np.uint8)
+
+
+def add_border(bit_array):
+    """ Surround an array of datamatrix bits (as returned by the bit reader) with the finder pattern and
+    timing pattern, and return the whole datamatrix. """
+    n = bit_array.shape[0] + 2
+    matrix = np.zeros((n, n), bool)
+    matrix[1:-1, 1:-1] = bit_array[::-1, :]
+
+    timing = (np.arange(n) + 1) % 2 == 1
+    matrix[0, :] = True
+    matrix[:, 0] = True
+    matrix[:, -1] = timing
+    matrix[-1, :] = timing
+    return matrix
+
+
+def random_datamatrix(rng, n=MATRIX_SIZE):
+    return add_border(rng.rand(n - 2, n - 2) < 0.5)
+
+
+def encode_datamatrix(message, size):
+    """ Return the datamatrix of the specified size that encodes an ASCII message. """
+    num_data_bytes = DatamatrixSizeTable.num_data_bytes(size)
+    data_bytes = [ord(c) + 1 for c in message] + [129] * (num_data_bytes - len(message))
+    encoded_bytes = ReedSolomonDecoder().encode(data_bytes, DatamatrixSizeTable.num_error_bytes(size))
+
+    # Find the byte and bit that the extractor takes from each position in the bit array
+    n = size - 2
+    bit_array = np.zeros((n, n), bool)
+    for i, j in itertools.product(range(n), range(n)):
+        probe = np.zeros((n, n), bool)
+        probe[i, j] = True
+        for byte, value in zip(encoded_bytes, DatamatrixByteExtractor.extract_bytes(probe)):
+            if value:
+                bit_array[i, j] = bool(byte & value)
+
+    return add_border(bit_array)
+
+
+def random_finder_pattern(rng):
+    corner = Point(rng.uniform(-30, 430), rng.uniform(-30, 330))
+    angle = rng.uniform(0, 2 * np.pi)
+    length = rng.uniform(20, 80)
+    base = Point(length * np.cos(angle), length * np.sin(angle))
+    side = Point(-length * np.sin(angle), length * np.cos(angle)) * rng.uniform(0.9, 1.1)
+    return FinderPattern(corner, base, side)
+
+
+class TestBitReader(unittest.TestCase):
+    def test_reads_datamatrix_bits(self):
+        rng = np.random.RandomState(0)
+        matrix = random_datamatrix(rng)
+        img = white_image()
+        finder_pattern = draw_datamatrix(img, matrix, (50, 190))
+        reader = DatamatrixBitReader(MATRIX_SIZE)
+
+        bit_array = reader.read_bit_array(finder_pattern, [0, 0], img)
+
+        assert np.array_equal(bit_array, matrix[::-1, :][1:-1, 1:-1])
+
+    def test_matches_reference_implementation(self):
+        rng = np.random.RandomState(1)
+        img = rng.randint(0, 256, (300, 400)).astype(np.uint8)
+        reader = DatamatrixBitReader(MATRIX_SIZE)
+
+        # Some of these patterns lie partly outside the image
+        finder_patterns = [random_finder_pattern(rng) for _ in range(100)]
+        for offset in ([0, 0], [0.25, -0.25]):
+            all_samples = reader.sample_bits(finder_patterns, offset, img)
+
+            for finder_pattern, samples in zip(finder_patterns, all_samples):
+                expected_samples = reference_samples(finder_pattern, offset, img)
+                assert np.array_equal(samples, expected_samples)
+
+                try:
+                    expected = reference_bit_array(expected_samples)
+                    DatamatrixBitReader._perform_sanity_check(expected)
+                except DatamatrixReaderError:
+                    expected = None
+
+                for supplied_samples in (samples, None):
+                    try:
+                        bit_array = reader.read_bit_array(finder_pattern, offset, img, supplied_samples)
+                    except DatamatrixReaderError:
+                        bit_array = None
+
+                    if expected is None:
+                        assert bit_array is None
+                    else:
+                        assert np.array_equal(bit_array, expected)
+
+
+class TestReadAll(unittest.TestCase):
+    def setUp(self):
+        # Two images, with datamatrices of two different sizes (and an area of noise) on each
+        rng = np.random.RandomState(2)
+        self.images = [white_image(), white_image()]
+        self.images[0][200:280, 300:380] = rng.randint(0, 256, (80, 80))
+        self.images[1][200:280, 300:380] = rng.randint(0, 256, (80, 80))
+
+        self.barcodes = []
+        for number, img in enumerate(self.images):
+            for size, corner in ((14, (20, 160)), (18, (200, 200))):
+                message = "IMG{}-DM{}".format(number, size)[:DatamatrixSizeTable.num_data_bytes(size)]
+                finder_pattern = draw_datamatrix(img, encode_datamatrix(message, size), corner)
+                self.barcodes.append((finder_pattern, img, size, message))
+
+            noise = FinderPattern(Point(300, 280), Point(80, 0), Point(0, -80))
+            self.barcodes.append((noise, img, 14, None))
+
+    def _make_barcodes(self):
+        datamatrices = []
+        for finder_pattern, img, size, _ in self.barcodes:
+            datamatrix = DataMatrix(finder_pattern, Image(img))
+            datamatrix.set_matrix_size(size)
+            datamatrices.append(datamatrix)
+        return datamatrices
+
+    def test_same_results_as_reading_each_barcode(self):
+        for offsets in ([[0, 0]], DataMatrix.DIAG_WIGGLES):
+            expected = self._make_barcodes()
+            for barcode in expected:
+                barcode.perform_read(offsets)
+
+            read_all = self._make_barcodes()
+            DataMatrix.read_all(read_all, offsets)
+
+            for barcode, (_, _, _, message) in zip(expected, self.barcodes):
+                assert barcode.is_valid() == (message is not None)
+                if message is not None:
+                    assert barcode.data() == message
+
+            for a, b in zip(expected, read_all):
+                assert b.is_read()
+                assert (a.is_read(), a.is_valid(), a.data()) == (b.is_read(), b.is_valid(), b.data())
+
+    def test_barcodes_already_read_are_not_read_again(self):
+        barcodes = self._make_barcodes()
+        barcodes[0].perform_read()
+        message = barcodes[0].data()
+
+        # If the barcode were read again, it would now be invalid
+        self.images[0][:] = 255
+        DataMatrix.read_all(barcodes)
+
+        assert barcodes[0].is_valid() and barcodes[0].data() == message
+        assert not barcodes[1].is_valid()
+        assert barcodes[3].is_valid()
+
+if __name__ == '__main__':
+    unittest.main()
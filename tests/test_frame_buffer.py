@@ -0,0 +1,48 @@
+import unittest
+
+import numpy as np
+
+from camera.frame_buffer import FrameBuffer
+
+
+class TestFrameBuffer(unittest.TestCase):
+    def test_frame_that_fits_is_stored_unchanged(self):
+        buffer = FrameBuffer(64, 48, 2)
+        frame = np.random.randint(0, 256, (40, 60, 3)).astype(np.uint8)
+
+        shape = buffer.write(0, frame)
+
+        assert shape == frame.shape
+        assert np.array_equal(buffer.frame(0, shape), frame)
+
+    def test_large_frame_keeps_aspect_ratio(self):
+        buffer = FrameBuffer(64, 48, 2)
+
+        square = buffer.write(0, np.zeros((100, 100, 3), np.uint8))
+        wide = buffer.write(1, np.zeros((480, 640, 3), np.uint8))
+
+        assert square == (55, 55, 3)
+        assert wide == (48, 64, 3)
+
+    def test_slots_are_separate(self):
+        buffer = FrameBuffer(8, 8, 2)
+        buffer.write(0, np.full((8, 8, 3), 10, np.uint8))
+        buffer.write(1, np.full((8, 8, 3), 20, np.uint8))
+        buffer.gray(0, (8, 8))[:] = 30
+
+        assert np.all(buffer.frame(0, (8, 8, 3)) == 10)
+        assert np.all(buffer.frame(1, (8, 8, 3)) == 20)
+        assert np.all(buffer.gray(0, (8, 8)) == 30)
+
+    def test_released_slots_can_be_acquired_again(self):
+        buffer = FrameBuffer(8, 8, 2)
+        first, second = buffer.acquire(), buffer.acquire()
+
+        assert buffer.acquire() is None
+
+        buffer.release(first)
+        assert buffer.acquire() == first
+        assert second != first
+
+if __name__ == '__main__':
+    unittest.main()
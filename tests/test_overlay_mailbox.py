@@ -0,0 +1,40 @@
+import unittest
+
+from camera.overlay_mailbox import OverlayMailbox
+
+
+class TestOverlayMailbox(unittest.TestCase):
+    def test_empty_mailbox_reads_none(self):
+        mailbox = OverlayMailbox()
+        assert mailbox.read() is None
+
+    def test_overlay_is_read_once(self):
+        mailbox = OverlayMailbox()
+        mailbox.publish({"text": "first"})
+
+        assert mailbox.read() == {"text": "first"}
+        assert mailbox.read() is None
+
+    def test_only_latest_overlay_is_read(self):
+        mailbox = OverlayMailbox()
+        mailbox.publish({"text": "first"})
+        mailbox.publish({"text": "second"})
+
+        assert mailbox.read() == {"text": "second"}
+
+    def test_same_overlay_can_be_published_again(self):
+        mailbox = OverlayMailbox()
+        overlay = {"text": "scanned"}
+
+        mailbox.publish(overlay)
+        mailbox.read()
+        mailbox.publish(overlay)
+
+        assert mailbox.read() == overlay
+
+    def test_large_overlay_is_rejected(self):
+        mailbox = OverlayMailbox(capacity=16)
+        self.assertRaises(ValueError, mailbox.publish, "x" * 100)
+
+if __name__ == '__main__':
+    unittest.main()